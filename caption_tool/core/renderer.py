@@ -2,6 +2,7 @@
 Caption rendering and video processing.
 """
 
+import bisect
 import cv2
 import numpy as np
 import subprocess
@@ -15,6 +16,11 @@ from utils import parse_time_to_seconds, ProgressTracker
 from exceptions import RenderingError, FontError
 
 
+# Parsed timeline: segment start times, segment end times and, per segment,
+# the (start, end) of each word, all in seconds
+SegmentIndex = Tuple[List[float], List[float], List[List[Tuple[float, float]]]]
+
+
 class CaptionRenderer:
     """Handles caption rendering and video processing."""
     
@@ -61,6 +67,14 @@ class CaptionRenderer:
         self.highlight_text = highlighting_mode in ["text", "both"]
         self.highlight_background = highlighting_mode in ["background", "both"]
         self.show_current_word_only = highlighting_mode == "current_word_only"
+        
+        # Fonts by size and segment layouts keyed by (font size, word texts),
+        # reused across frames
+        self._font_cache = {}
+        self._layout_cache = {}
+        
+        # Last rendered caption overlay as (segment, highlighted, size, overlay)
+        self._overlay_state = None
     
     def _load_font(self, font_size: int) -> ImageFont.ImageFont:
         """Load font for rendering with project fonts support."""
@@ -160,6 +174,14 @@ class CaptionRenderer:
         except Exception as e:
             raise FontError(f"Failed to load font: {e}")
 
+    def _get_font(self, font_size: int) -> ImageFont.ImageFont:
+        """Get the rendering font for a size, loading it only once."""
+        font = self._font_cache.get(font_size)
+        if font is None:
+            font = self._load_font(font_size)
+            self._font_cache[font_size] = font
+        return font
+
     def _get_system_fonts(self):
         """Get list of common system font paths."""
         system_fonts = []
@@ -222,8 +244,37 @@ class CaptionRenderer:
         draw.ellipse([x1, y2 - diameter, x1 + diameter, y2], fill=color)
         draw.ellipse([x2 - diameter, y2 - diameter, x2, y2], fill=color)
     
+    def _build_segment_index(self, segments: List[Dict[str, Any]]) -> SegmentIndex:
+        """
+        Parse segment and word timestamps once for per-frame lookups.
+        
+        Args:
+            segments: List of segment dictionaries in chronological order
+            
+        Returns:
+            Tuple of (start_times, end_times, word_times) in seconds
+        """
+        start_times = [parse_time_to_seconds(segment['start_time']) for segment in segments]
+        end_times = [parse_time_to_seconds(segment['end_time']) for segment in segments]
+        word_times = [
+            [(parse_time_to_seconds(word_data.get('start')), parse_time_to_seconds(word_data.get('end')))
+             for word_data in segment.get('words', [])]
+            for segment in segments
+        ]
+        return start_times, end_times, word_times
+    
+    def _find_active_segment_index(self, segment_index: SegmentIndex,
+                                   current_time: float) -> Optional[int]:
+        """Find the index of the segment shown at current_time using binary search."""
+        start_times, end_times, _ = segment_index
+        i = bisect.bisect_right(start_times, current_time) - 1
+        if i >= 0 and current_time < end_times[i]:
+            return i
+        return None
+    
     def _render_caption_on_frame(self, frame: np.ndarray, segments: List[Dict[str, Any]], 
-                                current_time: float) -> np.ndarray:
+                                current_time: float,
+                                segment_index: Optional[SegmentIndex] = None) -> np.ndarray:
         """
         Render captions on a single video frame.
         
@@ -231,37 +282,68 @@ class CaptionRenderer:
             frame: Video frame as numpy array
             segments: List of segment dictionaries
             current_time: Current time in seconds
+            segment_index: Pre-parsed segment times from _build_segment_index
             
         Returns:
             Frame with captions rendered
         """
+        # Find active segment
+        if segment_index is None:
+            segment_index = self._build_segment_index(segments)
+        segment_pos = self._find_active_segment_index(segment_index, current_time)
+        
+        if segment_pos is None:
+            # Nothing to draw, skip the PIL round-trip and font loading
+            return frame
+        
+        active_segment = segments[segment_pos]
+        
         # Convert frame to PIL Image
         image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).convert("RGBA")
-        width, height = image.size
         
-        # Calculate font size
-        font_size = int(height * self.font_size_scale)
-        font = self._load_font(font_size)
+        # The caption overlay only changes when the segment or its highlighted
+        # words change, so frames in between reuse the last rendered overlay
+        highlighted = tuple(
+            i for i, (word_start, word_end) in enumerate(segment_index[2][segment_pos])
+            if word_start <= current_time < word_end
+        )
+        cached = self._overlay_state
+        if (cached is not None and cached[0] is active_segment
+                and cached[1] == highlighted and cached[2] == image.size):
+            overlay = cached[3]
+        else:
+            overlay = self._render_caption_overlay(image.size, active_segment, highlighted)
+            self._overlay_state = (active_segment, highlighted, image.size, overlay)
         
-        # Find active segment
-        active_segment = None
-        for segment in segments:
-            start_time = parse_time_to_seconds(segment['start_time'])
-            end_time = parse_time_to_seconds(segment['end_time'])
+        result = Image.alpha_composite(image, overlay)
+        
+        # Convert back to BGR for OpenCV
+        return cv2.cvtColor(np.array(result.convert("RGB")), cv2.COLOR_RGB2BGR)
+    
+    def _render_caption_overlay(self, size: Tuple[int, int], active_segment: Dict[str, Any],
+                                highlighted: Tuple[int, ...]) -> Image.Image:
+        """
+        Render the caption for a segment onto a transparent overlay.
+        
+        Args:
+            size: (width, height) of the video frame
+            active_segment: Segment to render
+            highlighted: Indices of the segment's words being spoken
             
-            if start_time <= current_time < end_time:
-                active_segment = segment
-                break
+        Returns:
+            RGBA overlay with background, shadow and text layers composited
+        """
+        width, height = size
         
-        if not active_segment:
-            # Convert back to BGR for OpenCV
-            return cv2.cvtColor(np.array(image.convert("RGB")), cv2.COLOR_RGB2BGR)
+        # Calculate font size
+        font_size = int(height * self.font_size_scale)
+        font = self._get_font(font_size)
         
         # Create layers
-        shadow_layer = Image.new("RGBA", image.size, (0, 0, 0, 0))
-        text_layer = Image.new("RGBA", image.size, (0, 0, 0, 0))
-        bg_layer = Image.new("RGBA", image.size, (0, 0, 0, 0)) if self.background_color else None
-        highlight_bg_layer = Image.new("RGBA", image.size, (0, 0, 0, 0))
+        shadow_layer = Image.new("RGBA", size, (0, 0, 0, 0))
+        text_layer = Image.new("RGBA", size, (0, 0, 0, 0))
+        bg_layer = Image.new("RGBA", size, (0, 0, 0, 0)) if self.background_color else None
+        highlight_bg_layer = Image.new("RGBA", size, (0, 0, 0, 0))
         
         shadow_draw = ImageDraw.Draw(shadow_layer)
         text_draw = ImageDraw.Draw(text_layer)
@@ -273,24 +355,16 @@ class CaptionRenderer:
         
         if self.show_current_word_only:
             # Show only current word
-            active_word = None
-            for word_data in segment_words:
-                word_start = parse_time_to_seconds(word_data.get('start'))
-                word_end = parse_time_to_seconds(word_data.get('end'))
-                if word_start <= current_time < word_end:
-                    active_word = word_data
-                    break
-            
-            if active_word:
+            if highlighted:
                 self._render_single_word(
-                    active_word, font, width, height,
+                    segment_words[highlighted[0]], font, width, height,
                     shadow_draw, text_draw, bg_draw, highlight_bg_draw,
                     is_highlighted=True
                 )
         else:
             # Show full segment with highlighting
             self._render_full_segment(
-                active_segment, current_time, font, width, height,
+                active_segment, highlighted, font, font_size, width, height,
                 shadow_draw, text_draw, bg_draw, highlight_bg_draw
             )
         
@@ -298,15 +372,12 @@ class CaptionRenderer:
         blurred_shadow = shadow_layer.filter(ImageFilter.GaussianBlur(self.blur_radius))
         
         # Composite layers
-        result = image
-        if bg_layer:
-            result = Image.alpha_composite(result, bg_layer)
+        result = bg_layer if bg_layer else Image.new("RGBA", size, (0, 0, 0, 0))
         result = Image.alpha_composite(result, highlight_bg_layer)
         result = Image.alpha_composite(result, blurred_shadow)
         result = Image.alpha_composite(result, text_layer)
         
-        # Convert back to BGR for OpenCV
-        return cv2.cvtColor(np.array(result.convert("RGB")), cv2.COLOR_RGB2BGR)
+        return result
     
     def _render_single_word(self, word_data: Dict[str, Any], font: ImageFont.ImageFont,
                            width: int, height: int, shadow_draw: ImageDraw.ImageDraw,
@@ -356,8 +427,8 @@ class CaptionRenderer:
         text_color = self.highlight_color if (self.highlight_text and is_highlighted) else self.text_color
         text_draw.text((x_position, y_position), word_text, font=font, fill=tuple(text_color + [255]))
     
-    def _render_full_segment(self, segment: Dict[str, Any], current_time: float,
-                            font: ImageFont.ImageFont, width: int, height: int,
+    def _render_full_segment(self, segment: Dict[str, Any], highlighted: Tuple[int, ...],
+                            font: ImageFont.ImageFont, font_size: int, width: int, height: int,
                             shadow_draw: ImageDraw.ImageDraw, text_draw: ImageDraw.ImageDraw,
                             bg_draw: Optional[ImageDraw.ImageDraw], highlight_bg_draw: ImageDraw.ImageDraw) -> None:
         """Render full segment with word highlighting."""
@@ -365,14 +436,23 @@ class CaptionRenderer:
         if not segment_words:
             return
         
-        # Calculate word widths and total width
-        word_widths = []
-        for word_data in segment_words:
-            bbox = font.getbbox(word_data.get('text', ''))
-            word_widths.append(bbox[2] - bbox[0])
+        # Calculate word widths and total width once per segment, since a
+        # segment is shown unchanged for many consecutive frames
+        # Key on the requested size; the default bitmap font has no .size
+        layout_key = (font_size, tuple(word_data.get('text', '') for word_data in segment_words))
+        layout = self._layout_cache.get(layout_key)
+        if layout is None:
+            word_widths = []
+            for word_text in layout_key[1]:
+                bbox = font.getbbox(word_text)
+                word_widths.append(bbox[2] - bbox[0])
+            
+            total_width = sum(word_widths) + self.word_spacing * (len(segment_words) - 1)
+            text_height = font.getbbox('Aj')[3]
+            layout = (word_widths, total_width, text_height)
+            self._layout_cache[layout_key] = layout
         
-        total_width = sum(word_widths) + self.word_spacing * (len(segment_words) - 1)
-        text_height = font.getbbox('Aj')[3]
+        word_widths, total_width, text_height = layout
         
         # Calculate starting position
         start_x = int(width * self.position[0]) - (total_width // 2)
@@ -398,9 +478,7 @@ class CaptionRenderer:
             word_text = word_data.get('text', '')
             
             # Check if word is highlighted
-            word_start = parse_time_to_seconds(word_data.get('start'))
-            word_end = parse_time_to_seconds(word_data.get('end'))
-            is_highlighted = word_start <= current_time < word_end
+            is_highlighted = i in highlighted
             
             # Render highlight background if enabled
             if self.highlight_background and is_highlighted:
@@ -482,6 +560,9 @@ class CaptionRenderer:
             if self.progress_tracker:
                 self.progress_tracker.start_stage("Video Processing", total_frames, "Adding captions")
             
+            # Parse segment times once instead of on every frame
+            segment_index = self._build_segment_index(segments)
+            
             frame_count = 0
             processed_frames = 0
             
@@ -503,7 +584,7 @@ class CaptionRenderer:
                 current_time = frame_count / fps
                 
                 # Render captions on frame
-                processed_frame = self._render_caption_on_frame(frame, segments, current_time)
+                processed_frame = self._render_caption_on_frame(frame, segments, current_time, segment_index)
                 
                 # Write frame
                 out.write(processed_frame)
@@ -2,15 +2,21 @@
 Segment creation with width and duration constraints.
 """
 
-import re
 import os
 from typing import Dict, List, Any, Optional
-from PIL import Image, ImageFont, ImageDraw
+from PIL import ImageFont
 
 from utils import parse_time_to_seconds
 from exceptions import FontError
 
 
+# Apostrophes that can start a contraction
+_APOSTROPHES = frozenset({"'"})
+
+# Common contraction endings that follow an apostrophe
+_CONTRACTION_ENDINGS = frozenset({'re', 'll', 've', 's', 't', 'd', 'm'})
+
+
 class Segmenter:
     """Creates optimized caption segments from word data."""
     
@@ -34,9 +40,12 @@ class Segmenter:
         self.word_spacing = word_spacing
         self.font = self._load_font()
         
-        # Create temp image for text measurement
-        self.temp_image = Image.new('RGB', (max_width_pixels * 2, 100))
-        self.draw = ImageDraw.Draw(self.temp_image)
+        # Resolve text measurement once; fonts measure text directly
+        # without needing a drawing surface
+        self._text_length = getattr(self.font, 'getlength', None)
+        
+        # Word widths are cached per instance since they depend on the font
+        self._width_cache = {}
     
     def _load_font(self) -> ImageFont.ImageFont:
         """Load font for text measurement."""
@@ -50,14 +59,17 @@ class Segmenter:
     
     def _measure_text_width(self, text: str) -> int:
         """Measure text width in pixels."""
+        width = self._width_cache.get(text)
+        if width is None:
+            width = self._compute_text_width(text)
+            self._width_cache[text] = width
+        return width
+    
+    def _compute_text_width(self, text: str) -> int:
+        """Measure text width in pixels without caching."""
         try:
-            if hasattr(self.draw, 'textlength'):
-                # Newer PIL versions
-                return int(self.draw.textlength(text, font=self.font))
-            elif hasattr(self.draw, 'textsize'):
-                # Older PIL versions
-                width, _ = self.draw.textsize(text, font=self.font)
-                return int(width)
+            if self._text_length is not None:
+                return int(self._text_length(text))
             else:
                 # Fallback estimation
                 return len(text) * (self.font_size // 2)
@@ -66,8 +78,8 @@ class Segmenter:
             return len(text) * (self.font_size // 2)
     
     def _is_punctuation(self, text: str) -> bool:
-        """Check if text is punctuation."""
-        return re.match(r'^[^\w\s]$', text) is not None
+        """Check if text is a single punctuation character."""
+        return len(text) == 1 and not (text.isalnum() or text.isspace() or text == '_')
     
     def _group_words_with_punctuation(self, words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Group punctuation with preceding words and handle contractions."""
@@ -81,15 +93,12 @@ class Segmenter:
             
             if self._is_punctuation(word_text):
                 # Handle apostrophes in contractions
-                if word_text in ["'", "'"]:  # Apostrophe
+                if word_text in _APOSTROPHES:
                     if i + 1 < len(words):
                         next_word = words[i + 1]
                         next_text = next_word.get('text', '')
                         
-                        # Common contraction endings
-                        contraction_endings = ['re', 'll', 've', 's', 't', 'd', 'm']
-                        
-                        if any(next_text.lower() == ending for ending in contraction_endings):
+                        if next_text.lower() in _CONTRACTION_ENDINGS:
                             # This is a contraction
                             if current_group:
                                 combined_text = current_group['text'] + word_text + next_text
@@ -141,66 +150,70 @@ class Segmenter:
         # Create segments
         segments = []
         current_segment = {
-            'text': '',
+            'text_parts': [],
             'start_time': None,
             'end_time': None,
             'words': []
         }
         
         current_width = 0
+        segment_start_sec = 0.0
         space_width = self._measure_text_width(' ')
         
         for word in grouped_words:
             word_text = word.get('text', '')
             if not word_text.strip():
                 continue
+            word_start = word.get('start')
+            word_end = word.get('end')
             
             word_width = self._measure_text_width(word_text)
+            is_punctuation = self._is_punctuation(word_text)
             
             # Check if this is the first word in segment
             if current_segment['start_time'] is None:
-                current_segment['start_time'] = word.get('start')
-                current_segment['text'] = word_text
+                current_segment['start_time'] = word_start
+                current_segment['text_parts'] = [word_text]
                 current_segment['words'] = [word]
-                current_segment['end_time'] = word.get('end')
+                current_segment['end_time'] = word_end
                 current_width = word_width
+                segment_start_sec = parse_time_to_seconds(word_start)
                 continue
             
             # Calculate new width and duration
             new_width = current_width + space_width + word_width
             
-            # Calculate duration
-            start_time_sec = parse_time_to_seconds(current_segment['start_time'])
-            end_time_sec = parse_time_to_seconds(word.get('end'))
-            duration = end_time_sec - start_time_sec
+            # Calculate duration against the already parsed segment start
+            duration = parse_time_to_seconds(word_end) - segment_start_sec
             
             # Check if we need to start a new segment
             width_exceeded = new_width > self.max_width_pixels
             duration_exceeded = duration > self.max_duration_seconds
             
-            if (width_exceeded or duration_exceeded) and not self._is_punctuation(word_text):
+            if (width_exceeded or duration_exceeded) and not is_punctuation:
                 # Finish current segment
                 segments.append(current_segment)
                 
                 # Start new segment
                 current_segment = {
-                    'text': word_text,
-                    'start_time': word.get('start'),
-                    'end_time': word.get('end'),
+                    'text_parts': [word_text],
+                    'start_time': word_start,
+                    'end_time': word_end,
                     'words': [word]
                 }
                 current_width = word_width
+                segment_start_sec = parse_time_to_seconds(word_start)
             else:
                 # Add to current segment
-                if self._is_punctuation(word_text):
+                if is_punctuation:
                     # Append punctuation without space
-                    current_segment['text'] += word_text
+                    current_segment['text_parts'].append(word_text)
                 else:
                     # Add space before regular words
-                    current_segment['text'] += ' ' + word_text
+                    current_segment['text_parts'].extend((' ', word_text))
                 
                 current_segment['words'].append(word)
-                current_segment['end_time'] = word.get('end')
+                current_segment['end_time'] = word_end
                 current_width = new_width
         
         # Add final segment
@@ -214,7 +227,7 @@ class Segmenter:
                 'index': i + 1,
                 'start_time': segment['start_time'],
                 'end_time': segment['end_time'],
-                'text': segment['text'],
+                'text': ''.join(segment['text_parts']),
                 'words': segment['words']
             })
         
@@ -13,6 +13,11 @@ from exceptions import TranscriptionError
 from utils import ProgressTracker, format_srt_timestamp
 
 
+# Most recently loaded Whisper model by name, shared by all Transcriber
+# instances; only one is kept so switching models frees the previous one
+_MODEL_CACHE = {}
+
+
 class Transcriber:
     """Handles audio extraction and transcription using Whisper."""
     
@@ -30,11 +35,17 @@ class Transcriber:
     
     def _load_model(self) -> None:
         """Load Whisper model if not already loaded."""
+        if self.model is None:
+            self.model = _MODEL_CACHE.get(self.model_name)
+        
         if self.model is None:
             if self.progress_tracker:
                 self.progress_tracker.log(f"Loading Whisper model: {self.model_name}")
             
+            # Drop the previous model before loading so two never coexist
+            _MODEL_CACHE.clear()
             self.model = whisper.load_model(self.model_name)
+            _MODEL_CACHE[self.model_name] = self.model
     
     def extract_audio(self, media_path: str, temp_dir: str) -> str:
         """
@@ -5,6 +5,7 @@ Utility functions and progress tracking for the caption tool.
 import os
 import tempfile
 import shutil
+from functools import lru_cache
 from typing import Callable, Optional, Any
 from pathlib import Path
 from tqdm import tqdm
@@ -34,11 +35,15 @@ def validate_input_video(video_path: str, supported_formats: list) -> None:
         )
 
 
+@lru_cache(maxsize=8192)
 def parse_time_to_seconds(time_str: str) -> float:
     """
     Convert a time string to seconds.
     Format: HH:MM:SS,mmm or HH:MM:SS.mmm
     
+    Results are cached since the same word and segment timestamps are
+    parsed repeatedly during segmentation and rendering.
+    
     Args:
         time_str: Time string to parse
         
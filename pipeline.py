@@ -1,72 +1,159 @@
 import os
+import json
+import hashlib
+import tempfile
+import shutil
 import subprocess
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from dotenv import load_dotenv
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-import io
-import pickle
 
 # Load environment variables
 load_dotenv()
 
+# Resolve the FFmpeg binaries once instead of searching PATH on every call
+_FFMPEG = shutil.which('ffmpeg') or 'ffmpeg'
+_FFPROBE = shutil.which('ffprobe') or 'ffprobe'
+
+# Don't open a console window for each FFmpeg process on Windows
+_SUBPROCESS_KWARGS = {'creationflags': subprocess.CREATE_NO_WINDOW} if os.name == 'nt' else {}
+
 class VideoStoryPipeline:
+    # Bytes requested per Google Drive download chunk
+    DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+    # Chat model used for story generation; pass model='gpt-4' to opt back in
+    STORY_MODEL = 'gpt-4o-mini'
+    # Connect and read timeouts for API requests, in seconds
+    API_TIMEOUT = (10, 120)
+    # Hardware H.264 encoders used for re-encoding, in order of preference
+    HW_ENCODERS = ('h264_nvenc', 'h264_vaapi', 'h264_videotoolbox')
+    VAAPI_DEVICE = '/dev/dri/renderD128'
+    VIDEO_BITRATE = '6M'
+    # Narration codecs an MP4 can hold as-is, so they are copied rather than re-encoded
+    COPYABLE_AUDIO_CODECS = ('aac', 'mp3')
+    # Seconds without FFmpeg progress output before the process is killed
+    FFMPEG_STALL_TIMEOUT = 120
+    
     def __init__(self):
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.elevenlabs_api_key = os.getenv('ELEVENLABS_API_KEY')
         self.elevenlabs_voice_id = os.getenv('ELEVENLABS_VOICE_ID', 'default_voice_id')
         self.google_credentials_path = os.getenv('GOOGLE_CREDENTIALS_PATH', 'credentials.json')
-        self.token_path = 'token.pickle'
+        self.token_path = 'token.json'
+        self.cache_dir = os.getenv('PIPELINE_CACHE_DIR', '.cache')
+        
+        # Reuse HTTPS connections across API calls and retry rate limits
+        # and transient server errors with backoff. Read errors aren't
+        # retried: the server may already have accepted (and billed) the POST
+        retry = Retry(
+            total=5,
+            read=0,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["POST"],
+            raise_on_status=False  # Let the API error below report the last response
+        )
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
         
         # Google Drive API setup
         self.SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
+        self.credentials = None
         self.drive_service = None
         
-    def authenticate_google_drive(self):
-        """Authenticate with Google Drive API"""
+        # Detected lazily by _detect_hw_encoder; '' means none available
+        self._hw_encoder = None
+        
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _load_drive_service(token_path, credentials_path, scopes):
+        """Authorize and build a Drive service, shared by every pipeline using the same token"""
+        # Imported here so the Google client stack only loads when Drive is used
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from google.auth.transport.requests import Request
+        from googleapiclient.discovery import build
+        
         creds = None
         
         # Load existing token
-        if os.path.exists(self.token_path):
-            with open(self.token_path, 'rb') as token:
-                creds = pickle.load(token)
+        if os.path.exists(token_path):
+            creds = Credentials.from_authorized_user_file(token_path, scopes)
         
         # If no valid credentials, get new ones
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 creds.refresh(Request())
             else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    self.google_credentials_path, self.SCOPES)
+                flow = InstalledAppFlow.from_client_secrets_file(credentials_path, scopes)
                 creds = flow.run_local_server(port=0)
             
             # Save credentials for next run
-            with open(self.token_path, 'wb') as token:
-                pickle.dump(creds, token)
+            with open(token_path, 'w', encoding='utf-8') as token:
+                token.write(creds.to_json())
         
-        self.drive_service = build('drive', 'v3', credentials=creds)
+        # The Drive discovery document ships with the client, so skip the
+        # deprecated file cache for it
+        return creds, build('drive', 'v3', credentials=creds, cache_discovery=False)
+    
+    def authenticate_google_drive(self):
+        """Authenticate with Google Drive API"""
+        # Credentials refresh themselves when they expire, so the cached
+        # service stays usable for the life of the process
+        self.credentials, self.drive_service = self._load_drive_service(
+            self.token_path, self.google_credentials_path, tuple(self.SCOPES))
         return True
     
     def read_prompt_from_file(self, file_path):
         """Read story prompt from text file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read().strip()
+            # Read the raw bytes in one call and decode once
+            with open(file_path, 'rb') as file:
+                return file.read().decode('utf-8').strip()
         except FileNotFoundError:
             raise Exception(f"Prompt file not found: {file_path}")
     
-    def generate_story(self, prompt, word_count=500):
+    def _cache_path(self, kind, payload, extension):
+        """Cache location for an API request, keyed on its full payload"""
+        key = hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, kind, f"{key}{extension}")
+    
+    def _write_cache_entry(self, cache_path, content=None, source_path=None):
+        """Atomically write bytes, or a copy of the file at source_path, to a cache entry"""
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        
+        # Write to a temp file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if source_path is not None:
+                    # Copy in chunks rather than loading the file into memory
+                    with open(source_path, 'rb') as source:
+                        shutil.copyfileobj(source, f)
+                else:
+                    f.write(content)
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    
+    def generate_story(self, prompt, word_count=500, use_cache=True, model=None):
         """Generate story using OpenAI API"""
+        model = model or self.STORY_MODEL
+        
         headers = {
             'Authorization': f'Bearer {self.openai_api_key}',
             'Content-Type': 'application/json'
         }
         
         data = {
-            'model': 'gpt-4',
+            'model': model,
             'messages': [
                 {
                     'role': 'system',
@@ -81,22 +168,41 @@ class VideoStoryPipeline:
             'temperature': 0.8
         }
         
-        response = requests.post(
+        # The payload holds the prompt, word count and model, so any change
+        # to them produces a new cache entry
+        cache_path = self._cache_path('stories', data, '.txt')
+        if use_cache and os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                story = f.read()
+            print(f"Using cached story ({len(story.split())} words)")
+            return story
+        
+        response = self.session.post(
             'https://api.openai.com/v1/chat/completions',
             headers=headers,
-            json=data
+            json=data,
+            timeout=self.API_TIMEOUT
         )
         
         if response.status_code == 200:
             story = response.json()['choices'][0]['message']['content']
             print(f"Generated story ({len(story.split())} words)")
+            if use_cache:
+                # The cache is only an optimisation; don't lose a story that
+                # was already generated because it couldn't be saved
+                try:
+                    self._write_cache_entry(cache_path, story.encode('utf-8'))
+                except OSError as e:
+                    print(f"Warning: could not cache story: {e}")
             return story
         else:
             raise Exception(f"OpenAI API error: {response.status_code} - {response.text}")
     
-    def text_to_speech_elevenlabs(self, text, output_path="narration.mp3"):
+    def text_to_speech_elevenlabs(self, text, output_path="narration.mp3", use_cache=True):
         """Convert text to speech using ElevenLabs API"""
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{self.elevenlabs_voice_id}"
+        # The streaming endpoint starts sending audio while it is still being
+        # synthesized, so the download overlaps generation
+        url = f"https://api.elevenlabs.io/v1/text-to-speech/{self.elevenlabs_voice_id}/stream"
         
         headers = {
             "Accept": "audio/mpeg",
@@ -113,95 +219,279 @@ class VideoStoryPipeline:
             }
         }
         
-        response = requests.post(url, json=data, headers=headers)
-        
-        if response.status_code == 200:
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
-            print(f"Audio saved as {output_path}")
+        cache_path = self._cache_path('narration', {'voice_id': self.elevenlabs_voice_id, **data}, '.mp3')
+        if use_cache and os.path.exists(cache_path):
+            shutil.copyfile(cache_path, output_path)
+            print(f"Using cached audio for {output_path}")
             return output_path
-        else:
-            raise Exception(f"ElevenLabs API error: {response.status_code} - {response.text}")
+        
+        # Stream the audio straight to disk instead of buffering it in memory
+        with self.session.post(url, json=data, headers=headers, stream=True, timeout=self.API_TIMEOUT) as response:
+            if response.status_code == 200:
+                with open(output_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
+                print(f"Audio saved as {output_path}")
+                if use_cache:
+                    try:
+                        self._write_cache_entry(cache_path, source_path=output_path)
+                    except OSError as e:
+                        print(f"Warning: could not cache audio: {e}")
+                return output_path
+            else:
+                raise Exception(f"ElevenLabs API error: {response.status_code} - {response.text}")
     
-    def download_from_google_drive(self, file_id, output_path):
-        """Download file from Google Drive using file ID"""
+    def download_from_google_drive(self, file_id, output_path, cancel_event=None):
+        """Download file from Google Drive using file ID
+        
+        If cancel_event is set, the download stops after the current chunk,
+        the partial file is deleted and an exception is raised.
+        """
+        from google_auth_httplib2 import AuthorizedHttp
+        from googleapiclient.http import MediaIoBaseDownload, build_http
+        
         if not self.drive_service:
             self.authenticate_google_drive()
         
         request = self.drive_service.files().get_media(fileId=file_id)
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
+        # httplib2 connections are not thread-safe, so give each download
+        # its own authorized connection; build_http keeps the client's
+        # default timeout and redirect handling
+        request.http = AuthorizedHttp(self.credentials, http=build_http())
         
-        done = False
-        while done is False:
-            status, done = downloader.next_chunk()
-            print(f"Download progress: {int(status.progress() * 100)}%")
+        # Write chunks straight to the output file; large chunks mean fewer
+        # HTTP range requests per file
+        with open(output_path, 'wb') as fh:
+            downloader = MediaIoBaseDownload(fh, request, chunksize=self.DOWNLOAD_CHUNK_SIZE)
+            
+            done = False
+            cancelled = False
+            while done is False:
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                status, done = downloader.next_chunk()
+                print(f"Download progress ({output_path}): {int(status.progress() * 100)}%")
         
-        with open(output_path, 'wb') as f:
-            f.write(fh.getvalue())
+        if cancelled:
+            os.remove(output_path)
+            raise Exception(f"Download cancelled: {output_path}")
         
         print(f"Downloaded {output_path}")
         return output_path
     
-    def combine_with_ffmpeg(self, video_path, narration_path, music_path, output_path="final_video.mp4"):
-        """Combine video, narration, and background music using FFmpeg"""
-        
-        # FFmpeg command to combine video with narration and background music
-        # This command:
-        # - Takes the video file as main input
-        # - Adds narration audio
-        # - Adds background music at lower volume
-        # - Mixes the audio streams
-        cmd = [
-            'ffmpeg',
-            '-i', video_path,           # Video input
-            '-i', narration_path,       # Narration audio input
-            '-i', music_path,           # Background music input
-            '-filter_complex',
-            '[1:a]volume=1.0[narration];'    # Narration at full volume
-            '[2:a]volume=0.3[music];'        # Background music at 30% volume
-            '[narration][music]amix=inputs=2:duration=shortest[audio_out]',  # Mix audio
-            '-map', '0:v',              # Use video from first input
-            '-map', '[audio_out]',      # Use mixed audio
-            '-c:v', 'copy',             # Copy video codec (no re-encoding)
-            '-c:a', 'aac',              # Encode audio as AAC
-            '-shortest',                # End when shortest stream ends
-            '-y',                       # Overwrite output file
-            output_path
-        ]
-        
+    def _detect_hw_encoder(self):
+        """Return the first hardware H.264 encoder in the local FFmpeg build, or None"""
+        # Probe once per pipeline; the encoder list doesn't change between runs
+        if self._hw_encoder is None:
+            try:
+                result = subprocess.run(
+                    [_FFMPEG, '-hide_banner', '-encoders'],
+                    capture_output=True, text=True, check=True, **_SUBPROCESS_KWARGS
+                )
+                available = result.stdout
+            except (OSError, subprocess.CalledProcessError):
+                available = ''
+            self._hw_encoder = next((name for name in self.HW_ENCODERS if name in available), '')
+        return self._hw_encoder or None
+    
+    def _video_encode_args(self, encoder):
+        """Input and output FFmpeg arguments for re-encoding video with encoder"""
+        if encoder == 'h264_nvenc':
+            # Decode on the GPU too so frames never leave video memory
+            return (['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda'],
+                    ['-c:v', 'h264_nvenc', '-preset', 'p4', '-b:v', self.VIDEO_BITRATE])
+        if encoder == 'h264_vaapi':
+            return (['-vaapi_device', self.VAAPI_DEVICE],
+                    ['-vf', 'format=nv12,hwupload', '-c:v', 'h264_vaapi', '-b:v', self.VIDEO_BITRATE])
+        if encoder == 'h264_videotoolbox':
+            return [], ['-c:v', 'h264_videotoolbox', '-b:v', self.VIDEO_BITRATE]
+        return [], ['-c:v', 'libx264', '-preset', 'veryfast', '-b:v', self.VIDEO_BITRATE]
+    
+    def _ffprobe(self, path, *args):
+        """Run ffprobe on path and return its trimmed output, or None on failure"""
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            print(f"Video successfully created: {output_path}")
-            return output_path
-        except subprocess.CalledProcessError as e:
-            raise Exception(f"FFmpeg error: {e.stderr}")
+            result = subprocess.run(
+                [_FFPROBE, '-v', 'error', *args, '-of', 'csv=p=0', path],
+                capture_output=True, text=True, check=True, **_SUBPROCESS_KWARGS
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return result.stdout.strip() or None
     
-    def run_pipeline(self, prompt_file, video_file_id, music_file_id, target_word_count=500):
-        """Run the complete pipeline"""
+    def _probe_audio_codec(self, path):
+        """Return the codec name of the first audio stream in path, or None"""
+        return self._ffprobe(path, '-select_streams', 'a:0', '-show_entries', 'stream=codec_name')
+    
+    def _probe_duration(self, path):
+        """Return the duration of path in seconds, or None if it can't be read"""
+        try:
+            return float(self._ffprobe(path, '-show_entries', 'format=duration'))
+        except (TypeError, ValueError):
+            return None
+    
+    def _run_ffmpeg(self, cmd, progress_callback=None):
+        """Run an FFmpeg command, reporting progress and killing it if it stalls
+        
+        progress_callback, if given, is called with the output position in
+        seconds. Raises subprocess.CalledProcessError with FFmpeg's stderr on
+        failure.
+        """
+        cmd = [cmd[0], '-progress', 'pipe:1', '-nostats', *cmd[1:]]
+        last_progress = [time.monotonic()]
+        
+        def read_progress():
+            for line in proc.stdout:
+                last_progress[0] = time.monotonic()
+                key, _, value = line.strip().partition('=')
+                # Despite its name, out_time_ms is in microseconds
+                if key == 'out_time_ms' and value.isdigit() and progress_callback:
+                    progress_callback(int(value) / 1_000_000)
+        
+        # stderr goes to a file so a chatty FFmpeg can never block on a full pipe
+        with tempfile.TemporaryFile() as stderr_file:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file,
+                                    encoding='utf-8', errors='replace', **_SUBPROCESS_KWARGS)
+            reader = threading.Thread(target=read_progress, daemon=True)
+            reader.start()
+            
+            stalled = False
+            while True:
+                try:
+                    proc.wait(timeout=1)
+                    break
+                except subprocess.TimeoutExpired:
+                    if time.monotonic() - last_progress[0] > self.FFMPEG_STALL_TIMEOUT:
+                        proc.kill()
+                        proc.wait()
+                        stalled = True
+                        break
+            reader.join()
+            
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode('utf-8', errors='replace')
+        
+        if stalled:
+            raise Exception(f"FFmpeg made no progress for {self.FFMPEG_STALL_TIMEOUT} seconds: {stderr}")
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+    
+    def combine_with_ffmpeg(self, video_path, narration_path, music_path, output_path="final_video.mp4",
+                            reencode=False, progress_callback=None):
+        """Combine video, narration, and background music using FFmpeg
+        
+        The video stream is copied unless reencode is True, in which case it is
+        encoded with a hardware H.264 encoder when one is available. Without
+        music_path the narration is muxed directly, copying its audio when the
+        codec allows. progress_callback receives the output position in seconds.
+        """
+        if music_path:
+            audio_inputs = ['-i', music_path]       # Background music input
+            audio_args = [
+                '-filter_complex',
+                '[1:a]volume=1.0[narration];'    # Narration at full volume
+                '[2:a]volume=0.3[music];'        # Background music at 30% volume
+                '[narration][music]amix=inputs=2:duration=shortest[audio_out]',  # Mix audio
+                '-map', '0:v',              # Use video from first input
+                '-map', '[audio_out]',      # Use mixed audio
+                '-c:a', 'aac',              # Encode audio as AAC
+            ]
+        else:
+            # Nothing to mix, so skip the filter and avoid an audio encode
+            narration_codec = self._probe_audio_codec(narration_path)
+            audio_inputs = []
+            audio_args = [
+                '-map', '0:v',              # Use video from first input
+                '-map', '1:a',              # Use narration audio as-is
+                '-c:a', 'copy' if narration_codec in self.COPYABLE_AUDIO_CODECS else 'aac',
+            ]
+        
+        # The output ends with the audio, so only read that much of the video
+        audio_durations = [self._probe_duration(path) for path in (narration_path, music_path) if path]
+        if None in audio_durations:
+            trim_args = []
+        else:
+            trim_args = ['-t', f"{min(audio_durations):.3f}"]
+        
+        if reencode:
+            # Fall back to software encoding if the hardware encoder is listed
+            # but the device isn't usable
+            encoders = [name for name in (self._detect_hw_encoder(), 'libx264') if name]
+        else:
+            encoders = [None]
+        
+        for attempt, encoder in enumerate(encoders, start=1):
+            if encoder:
+                input_args, video_args = self._video_encode_args(encoder)
+            else:
+                input_args, video_args = [], ['-c:v', 'copy']  # Copy video codec (no re-encoding)
+            
+            # FFmpeg command to combine video with narration and background music
+            # This command:
+            # - Takes the video file as main input
+            # - Adds narration audio
+            # - Adds background music at lower volume, if any
+            # - Mixes the audio streams
+            cmd = [
+                _FFMPEG,
+                *input_args,                # Hardware decode/device setup, if any
+                *trim_args,                 # Stop reading video once the audio ends
+                '-i', video_path,           # Video input
+                '-i', narration_path,       # Narration audio input
+                *audio_inputs,              # Background music input, if any
+                *audio_args,                # Audio mixing, mapping and codec
+                *video_args,                # Video codec
+                '-shortest',                # End when shortest stream ends
+                '-y',                       # Overwrite output file
+                output_path
+            ]
+            
+            try:
+                self._run_ffmpeg(cmd, progress_callback)
+                print(f"Video successfully created: {output_path}")
+                return output_path
+            except subprocess.CalledProcessError as e:
+                if attempt == len(encoders):
+                    raise Exception(f"FFmpeg error: {e.stderr}")
+                print(f"{encoder} encoding failed, retrying with {encoders[attempt]}")
+    
+    def run_pipeline(self, prompt_file, video_file_id, music_file_id=None, target_word_count=500, use_cache=True,
+                     model=None):
+        """Run the complete pipeline; music_file_id=None skips the background music"""
         print("Starting video story pipeline...")
         
+        executor = ThreadPoolExecutor(max_workers=2)
+        cancel_downloads = threading.Event()
+        
         try:
-            # Step 1: Read prompt
+            # Step 1: Read prompt; it's local and cheap, so a missing file
+            # fails before any Google sign-in or transfer
             print("1. Reading prompt from file...")
             prompt = self.read_prompt_from_file(prompt_file)
             
-            # Step 2: Generate story
-            print("2. Generating story...")
-            story = self.generate_story(prompt, target_word_count)
+            # Step 2: Start the downloads next; video and music don't depend
+            # on the story, so they transfer while it is generated and narrated
+            print("2. Starting video and background music downloads from Google Drive...")
+            self.authenticate_google_drive()
+            video_future = executor.submit(
+                self.download_from_google_drive, video_file_id, "video.mp4", cancel_downloads)
+            music_future = None
+            if music_file_id:
+                music_future = executor.submit(
+                    self.download_from_google_drive, music_file_id, "background_music.mp3", cancel_downloads)
             
-            # Step 3: Convert to speech
-            print("3. Converting story to speech...")
-            narration_file = self.text_to_speech_elevenlabs(story, "narration.mp3")
+            # Step 3: Generate story
+            print("3. Generating story...")
+            story = self.generate_story(prompt, target_word_count, use_cache=use_cache, model=model)
             
-            # Step 4: Authenticate and download video
-            print("4. Downloading video from Google Drive...")
-            self.authenticate_google_drive()
-            video_file = self.download_from_google_drive(video_file_id, "video.mp4")
+            # Step 4: Convert to speech
+            print("4. Converting story to speech...")
+            narration_file = self.text_to_speech_elevenlabs(story, "narration.mp3", use_cache=use_cache)
             
-            # Step 5: Download background music
-            print("5. Downloading background music from Google Drive...")
-            music_file = self.download_from_google_drive(music_file_id, "background_music.mp3")
+            # Step 5: Wait for the downloads to finish
+            print("5. Waiting for Google Drive downloads...")
+            video_file = video_future.result()
+            music_file = music_future.result() if music_future else None
             
             # Step 6: Combine everything
             print("6. Combining video, narration, and music...")
@@ -217,7 +507,98 @@ class VideoStoryPipeline:
             
         except Exception as e:
             print(f"❌ Pipeline failed: {str(e)}")
+            # The downloads are already running, so ask them to stop rather
+            # than letting them finish (and keep the process alive) unused
+            cancel_downloads.set()
+            raise
+        finally:
+            executor.shutdown(wait=False)
+
+    def _run_batch_item(self, prompt, item_dir, video_future, music_future, target_word_count, use_cache, model,
+                        tts_slots):
+        """Generate, narrate and combine the video for one prompt of a batch"""
+        os.makedirs(item_dir, exist_ok=True)
+        
+        story = self.generate_story(prompt, target_word_count, use_cache=use_cache, model=model)
+        # ElevenLabs caps concurrent requests per key, so only a few
+        # narrations are synthesized at once
+        with tts_slots:
+            narration_file = self.text_to_speech_elevenlabs(
+                story, os.path.join(item_dir, "narration.mp3"), use_cache=use_cache)
+        
+        # The shared downloads are only needed once the narration is ready
+        return self.combine_with_ffmpeg(
+            video_future.result(),
+            narration_file,
+            music_future.result() if music_future else None,
+            os.path.join(item_dir, "final_story_video.mp4")
+        )
+    
+    def run_pipeline_batch(self, prompt_files, video_file_id, music_file_id=None, target_word_count=500,
+                           output_dir="batch_output", max_workers=4, tts_concurrency=2, use_cache=True,
+                           model=None):
+        """Run the pipeline for several prompts sharing one video and music track
+        
+        The video and music are downloaded once. Each prompt gets its own story,
+        narration and final video in a numbered subdirectory of output_dir.
+        At most tts_concurrency narrations are requested from ElevenLabs at once.
+        Returns the final video paths in the same order as prompt_files.
+        """
+        print(f"Starting batch video story pipeline for {len(prompt_files)} prompts...")
+        
+        # Read every prompt before any Google sign-in or transfer, so a
+        # missing file fails the batch straight away
+        prompts = [self.read_prompt_from_file(prompt_file) for prompt_file in prompt_files]
+        os.makedirs(output_dir, exist_ok=True)
+        
+        download_executor = ThreadPoolExecutor(max_workers=2)
+        item_executor = ThreadPoolExecutor(max_workers=max_workers)
+        tts_slots = threading.BoundedSemaphore(tts_concurrency)
+        cancel_downloads = threading.Event()
+        
+        try:
+            self.authenticate_google_drive()
+            video_future = download_executor.submit(
+                self.download_from_google_drive, video_file_id, os.path.join(output_dir, "video.mp4"),
+                cancel_downloads)
+            music_future = None
+            if music_file_id:
+                music_future = download_executor.submit(
+                    self.download_from_google_drive, music_file_id, os.path.join(output_dir, "background_music.mp3"),
+                    cancel_downloads)
+            
+            # Items are tracked by their numbered directory, so repeated
+            # prompt files still produce separate videos
+            items = []
+            for i, (prompt_file, prompt) in enumerate(zip(prompt_files, prompts), start=1):
+                name = os.path.splitext(os.path.basename(prompt_file))[0]
+                item_dir = os.path.join(output_dir, f"{i:02d}_{name}")
+                items.append((item_dir, item_executor.submit(
+                    self._run_batch_item, prompt, item_dir,
+                    video_future, music_future, target_word_count, use_cache, model, tts_slots)))
+            
+            # Let every prompt finish before reporting failures
+            results = []
+            failures = []
+            for item_dir, future in items:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"❌ {item_dir} failed: {str(e)}")
+                    failures.append(item_dir)
+            
+            if failures:
+                raise Exception(f"Batch pipeline failed for {len(failures)} of {len(prompt_files)} prompts: {', '.join(failures)}")
+            
+            print(f"✅ Batch pipeline completed successfully! {len(results)} videos in {output_dir}")
+            return results
+        except Exception:
+            # Stop the running downloads instead of waiting for them to finish unused
+            cancel_downloads.set()
             raise
+        finally:
+            item_executor.shutdown(wait=False)
+            download_executor.shutdown(wait=False)
 
 # Example usage
 if __name__ == "__main__":